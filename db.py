@@ -1,4 +1,5 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 
@@ -12,7 +13,15 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 DEBUG = os.getenv("DEBUG")
 
 # Inisialisasi Koneksi
-client = AsyncIOMotorClient(MONGO_URI)
+# Satu client (dan satu connection pool) dipakai bersama oleh seluruh aplikasi.
+# JANGAN membuat AsyncMongoClient baru per request, gunakan get_client();
+# client per request membuka pool dan handshake baru setiap kali dan jauh lebih lambat.
+# minPoolSize menjaga beberapa koneksi tetap terbuka (tidak dibuka saat request pertama)
+@lru_cache(maxsize=1)
+def get_client() -> AsyncMongoClient:
+    return AsyncMongoClient(MONGO_URI, minPoolSize=5, maxPoolSize=50, serverSelectionTimeoutMS=5000)
+
+client = get_client()
 db = client[DB]
 
 # Koleksi
@@ -1,50 +1,146 @@
+import logging
+import queue
+import sys
+import time
 from datetime import datetime, timedelta
-from fastapi import FastAPI, HTTPException, Request, Header, Depends
-from fastapi.responses import JSONResponse
+from logging.handlers import QueueHandler, QueueListener
+import bcrypt  # Hashing password
+import orjson
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, Header, Depends, Body
+from fastapi.responses import JSONResponse, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel, EmailStr, constr
+from pydantic import BaseModel, ConfigDict, EmailStr, constr
 from typing import List, Optional
-from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
-from jose import JWTError, jwt
-from db import users_collection, tasks_collection
-from passlib.context import CryptContext  # Hashing password
+from bson.errors import InvalidId
+from pymongo import InsertOne
+from pymongo.errors import DuplicateKeyError
+import jwt  # PyJWT
+from jwt import PyJWTError
+from db import client, users_collection, tasks_collection
 
 # HTTPException → Untuk menangani error dengan kode status HTTP.
-# Request → Untuk menangani request HTTP dalam middleware.
 # Depends → Untuk dependency injection (bisa untuk middleware per route).
 # JSONResponse → Untuk mengembalikan respons dalam format JSON.
+# orjson → serialisasi JSON yang lebih cepat dari modul json bawaan (dipakai MongoJSONResponse).
 # BaseModel dan EmailStr dari pydantic → Untuk validasi data input.
 # List, Optional dari typing → Untuk menentukan tipe data dalam list dan parameter opsional.
-# motor, driver untuk asinkron dengan mongodb.
+# pymongo AsyncMongoClient (di db.py), driver asinkron native untuk mongodb.
 # ObjectId, mengubah id menjadi objectid agar bisa disimpan di mongodb.
 
 # Konfigurasi JWT
 SECRET_KEY = "your_secret_key_here"
 ALGORITHM = "HS256"
+# disiapkan sekali saat modul dimuat, tidak dibuat ulang di setiap encode/decode token
+SECRET_KEY_BYTES = SECRET_KEY.encode()
+ALGORITHMS = (ALGORITHM,)
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 #menangani autentikasi menggunakan OAuth2 dengan skema Bearer Token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
-# Konfigurasi hashing password
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-app = FastAPI()
+# Cache hasil autentikasi token -> (user, exp), agar jwt.decode dan query user
+# tidak diulang di setiap request dengan token yang sama.
+# Cache ini per proses: invalidasi hanya berlaku di worker yang menangani perubahan.
+# Dengan beberapa worker (run_prod.py), perubahan user (role, nonaktif, dihapus)
+# baru terlihat di worker lain paling lama setelah ttl (60 detik).
+user_cache = TTLCache(maxsize=10_000, ttl=60)
+# index user_id -> set token di user_cache, agar invalidasi tidak memindai seluruh cache
+user_cache_tokens = TTLCache(maxsize=10_000, ttl=60)
+# dinaikkan setiap ada invalidasi; hasil query yang dimulai sebelum invalidasi tidak disimpan
+user_cache_generation = 0
+
+# Cache response GET /users (bytes JSON) selama beberapa detik,
+# dihapus setiap kali ada perubahan data user
+users_list_cache = TTLCache(maxsize=128, ttl=3)
+# dinaikkan setiap cache dihapus; hasil query yang dimulai sebelumnya tidak disimpan
+users_list_generation = 0
+USERS_LIST_LIMIT = 100
+
+# Batas jumlah item dalam satu request bulk (/tasks/bulk)
+BULK_MAX_ITEMS = 1000
 
-# Middleware global untuk logging dan error handling
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    try:
-        print(f"Incoming request: {request.method} {request.url}")
-        response = await call_next(request)
-        return response
-    except Exception as e:
-        return JSONResponse(status_code=500, content={"detail": "Internal Server Error", "error": str(e)})
+# Konfigurasi hashing password
+BCRYPT_ROUNDS = 12
+# bcrypt hanya memakai 72 byte pertama; password dipotong seperti yang dilakukan passlib
+# agar hash lama tetap cocok dan password panjang tidak menyebabkan ValueError (500)
+BCRYPT_MAX_BYTES = 72
+
+# Konfigurasi logging: handler hanya memasukkan log ke queue,
+# penulisan ke stdout dilakukan QueueListener di thread terpisah
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+
+# Response JSON berbasis orjson yang bisa langsung menyerialisasi ObjectId,
+# sehingga `_id` tidak perlu dikonversi ke string satu per satu
+def orjson_default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError
+
+class MongoJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+app = FastAPI(default_response_class=MongoJSONResponse)
+
+@app.on_event("startup")
+async def startup():
+    log_listener.start()
+    # membuka koneksi ke mongodb sejak awal agar request pertama tidak menunggu handshake
+    await client.admin.command("ping")
+    # index unik email, pengecekan email duplikat dilakukan oleh mongodb
+    await users_collection.create_index("email", unique=True)
+    # index user_id agar query task per user memakai IXSCAN, bukan COLLSCAN
+    await tasks_collection.create_index([("user_id", 1)])
+
+@app.on_event("shutdown")
+async def shutdown():
+    log_listener.stop()
+
+# Middleware global untuk logging dan error handling.
+# Ditulis sebagai ASGI murni (bukan @app.middleware("http")) agar tidak membuat
+# objek Request/Response dan task group tambahan di setiap request.
+class LoggingASGIMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # selain http (lifespan, websocket) langsung diteruskan
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        logger.info("Incoming request: %s %s", scope["method"], scope["path"])
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # jika response sudah mulai dikirim, tidak bisa diganti dengan 500
+            if response_started:
+                raise
+            response = JSONResponse(status_code=500, content={"detail": "Internal Server Error", "error": str(e)})
+            await response(scope, receive, send)
+
+app.add_middleware(LoggingASGIMiddleware)
 
 
 # Model untuk User
 class User(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     name: str
     email: EmailStr
     password: str
@@ -53,6 +149,8 @@ class User(BaseModel):
 
 # Model untuk Task
 class Task(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     title: str
     description: str
     user_id: str
@@ -64,11 +162,13 @@ class Token(BaseModel):
 
 # Fungsi hashing dan verifikasi password
 def hash_password(password: str) -> str: #mengenkripsi atau meng-hash password sebelum disimpan ke database.
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode()[:BCRYPT_MAX_BYTES], bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 #memeriksa apakah password yang dimasukkan oleh pengguna sesuai dengan password yang telah di-hash dan disimpan di database.
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode()
+    return bcrypt.checkpw(plain_password.encode()[:BCRYPT_MAX_BYTES], hashed_password)
 
 # membuat JSON Web Token (JWT) yang digunakan untuk autentikasi pengguna.
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -76,7 +176,29 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     # menentukan waktu kadaluarsa token
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=15))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=ALGORITHM)
+
+# menghapus cache autentikasi milik user setelah datanya berubah atau dihapus
+def invalidate_cached_user(user_id: ObjectId):
+    global user_cache_generation
+    user_cache_generation += 1
+    for token in user_cache_tokens.pop(user_id, ()):
+        user_cache.pop(token, None)
+
+# menghapus cache GET /users setelah ada perubahan data user
+def invalidate_users_list():
+    global users_list_generation
+    users_list_generation += 1
+    users_list_cache.clear()
+
+# menyimpan hasil autentikasi ke cache beserta index user_id -> token
+def cache_user(token: str, user: dict, exp: int):
+    user_cache[token] = (user, exp)
+    # token lama yang sudah kadaluarsa dari user_cache dibuang dari index
+    tokens = {t for t in user_cache_tokens.get(user["_id"], ()) if t in user_cache}
+    tokens.add(token)
+    # di-set ulang agar ttl index diperbarui dan tidak habis lebih dulu dari tokennya
+    user_cache_tokens[user["_id"]] = tokens
 
 # autentikasi setiap pengguna berdasarkan token JWT
 async def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -85,10 +207,22 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Invalid or expired token",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+    # gunakan hasil cache selama token belum kadaluarsa
+    cached = user_cache.get(token)
+    if cached is not None:
+        user, exp = cached
+        # token yang tidak ada di index (index sudah dibuang) dianggap tidak ada di cache
+        if exp > time.time() and token in user_cache_tokens.get(user["_id"], ()):
+            return user
+        user_cache.pop(token, None)
+
+    # dibaca sebelum query: jika ada invalidasi selama query berjalan, hasilnya tidak di-cache
+    generation = user_cache_generation
     
     try:
         # mendapatkan payload dari token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY_BYTES, algorithms=ALGORITHMS)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -98,14 +232,46 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         if user is None:
             raise credentials_exception
 
+        exp = payload.get("exp")
+        if exp and generation == user_cache_generation:
+            cache_user(token, user, exp)
         return user
     
-    except JWTError:
+    except PyJWTError:
         raise credentials_exception
 
+# mengubah id dari path menjadi ObjectId, id yang tidak valid langsung ditolak (400)
+# sebelum ada query ke database.
+# Dependency dibuat async def agar FastAPI tidak menjalankannya lewat threadpool.
+def parse_object_id(value: str, detail: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail=detail)
+
+async def user_object_id(user_id: str) -> ObjectId:
+    return parse_object_id(user_id, "Invalid user ID format")
+
+async def task_object_id(task_id: str) -> ObjectId:
+    return parse_object_id(task_id, "Invalid task ID format")
+
+# filter user berdasarkan id: admin bisa mengakses user manapun,
+# selain admin hanya data miliknya sendiri
+def user_owner_filter(user_id: ObjectId, current_user: dict) -> dict:
+    if current_user["role"] == "admin":
+        return {"_id": user_id}
+    return {"_id": user_id, "email": current_user["email"]}
+
+# dipanggil hanya jika query dengan filter otorisasi tidak menemukan dokumen,
+# untuk membedakan dokumen yang tidak ada (404) dengan yang bukan haknya (403)
+async def raise_not_found_or_forbidden(collection, object_id: ObjectId, not_found: str, forbidden: str):
+    if await collection.find_one({"_id": object_id}, projection={"_id": 1}) is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    raise HTTPException(status_code=403, detail=forbidden)
+
 # membatasi akses ke endpoint berdasarkan peran (role) pengguna.
 def check_role(required_roles: List[str]):
-    def role_checker(user: dict = Depends(get_current_user)):
+    async def role_checker(user: dict = Depends(get_current_user)):
         # memeriksa apakah pengguna ada dalam role
         if user["role"] not in required_roles:
             raise HTTPException(status_code=403, detail="Access forbidden")
@@ -128,177 +294,204 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 @app.post("/users", status_code=201)
 async def create_user(body: User):
     # """ Buat user baru dengan password yang di-hash """
-    existing_user = await users_collection.find_one({"email": body.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already exists")
-
-    new_user = body.dict()
+    new_user = body.model_dump()
     new_user["password"] = hash_password(new_user["password"])  # Hash password sebelum disimpan
     new_user["_id"] = ObjectId()  # membuat _id ObjectId agar bisa disimpan ke mongodb
 
-    await users_collection.insert_one(new_user)
-    # Konversi `_id` ke string agar bisa dikembalikan dalam response JSON
-    new_user["_id"] = str(new_user["_id"])
+    try:
+        await users_collection.insert_one(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already exists")
+    invalidate_users_list()
 
-    return {"message": "User created successfully", "user": new_user}
+    # dikembalikan langsung sebagai MongoJSONResponse agar `_id` (ObjectId) diserialisasi orjson
+    return MongoJSONResponse(status_code=201, content={"message": "User created successfully", "user": new_user})
 
 @app.get("/users/me")
 async def read_users_me(current_user: dict = Depends(get_current_user)):
     return {"message": "Authenticated", "user": {"email": current_user["email"], "name": current_user["name"]}}
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"Hello": "Backend"}
 
 # get user hanya bisa dilihat oleh role admin
 @app.get("/users", dependencies=[Depends(check_role(["admin"]))])
 async def get_users():
-    users = await users_collection.find().to_list(100)
-    for user in users:
-        user["_id"] = str(user["_id"]) # Konversi `_id` ke string agar bisa dikembalikan dalam response JSON
-    return users
+    cache_key = ("users", USERS_LIST_LIMIT)
+    body = users_list_cache.get(cache_key)
+    if body is None:
+        # dibaca sebelum query: jika cache dihapus selama query berjalan, hasilnya tidak disimpan
+        generation = users_list_generation
+        # password tidak ikut diambil dari database maupun dikirim ke client
+        cursor = users_collection.find({}, projection={"password": 0}).limit(USERS_LIST_LIMIT)
+        users = [user async for user in cursor]
+        body = MongoJSONResponse(content=users).body
+        if generation == users_list_generation:
+            users_list_cache[cache_key] = body
+    return Response(content=body, media_type="application/json")
 
 @app.put("/users/{user_id}")
-async def update_user(user_id: str, update_data: dict, current_user: dict = Depends(get_current_user)):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Cek apakah user yang login adalah yang punya data atau admin
-    if current_user["email"] != user["email"] and current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+async def update_user(update_data: dict, user_id: ObjectId = Depends(user_object_id), current_user: dict = Depends(get_current_user)):
+    # Cek dan update dalam satu query: hanya yang punya data atau admin
+    try:
+        user = await users_collection.find_one_and_update(
+            user_owner_filter(user_id, current_user),
+            {"$set": update_data},
+            projection={"_id": 1},
+        )
+    except DuplicateKeyError:
+        # email baru sudah dipakai user lain (index unik email)
+        raise HTTPException(status_code=400, detail="Email already exists")
+    if user is None:
+        await raise_not_found_or_forbidden(users_collection, user_id, "User not found", "Not authorized")
 
-    await users_collection.update_one({"_id": ObjectId(user_id)}, {"$set": update_data})
+    invalidate_cached_user(user_id)
+    invalidate_users_list()
     return {"message": "User updated successfully"}
 
 
 # PATCH: Nonaktifkan akun user
 @app.patch("/users/{user_id}/deactivate")
-async def deactivate_user(user_id: str, current_user: dict = Depends(get_current_user)):
-    # Ambil data user berdasarkan ID
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Hanya admin atau user itu sendiri yang bisa menonaktifkan akun
-    if current_user["email"] != user["email"] and current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized to deactivate this user")
-
-    # Update status isActived menjadi False
-    result = await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": {"isActived": False}}
+async def deactivate_user(user_id: ObjectId = Depends(user_object_id), current_user: dict = Depends(get_current_user)):
+    # Update status isActived menjadi False,
+    # hanya admin atau user itu sendiri yang bisa menonaktifkan akun
+    user = await users_collection.find_one_and_update(
+        user_owner_filter(user_id, current_user),
+        {"$set": {"isActived": False}},
+        projection={"_id": 1},
     )
 
-    if result.matched_count == 0:
-        raise HTTPException(status_code=500, detail="Failed to deactivate user")
+    if user is None:
+        await raise_not_found_or_forbidden(users_collection, user_id, "User not found", "Not authorized to deactivate this user")
+    invalidate_cached_user(user_id)
+    invalidate_users_list()
 
     return {"message": "User is Deactivated"}
 
 
 @app.delete("/users/{user_id}")
-async def delete_user(user_id: str, current_user: dict = Depends(get_current_user)):
+async def delete_user(user_id: ObjectId = Depends(user_object_id), current_user: dict = Depends(get_current_user)):
     # Cek user adalah admin
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to delete this user")
 
-    result = await users_collection.delete_one({"_id": ObjectId(user_id)})
+    result = await users_collection.delete_one({"_id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    invalidate_cached_user(user_id)
+    invalidate_users_list()
     return {"message": "User deleted successfully"}
 
 #------------------
 # Crud Task
 
-@app.post("/tasks", response_model=dict, dependencies=[Depends(check_role(["admin", "editor"]))])
+@app.post("/tasks", dependencies=[Depends(check_role(["admin", "editor"]))])
 async def create_task(task: Task, current_user: dict = Depends(get_current_user)):
-    try:
-        # Pastikan user_id yang dikirim sama dengan yang login
-        if task.user_id != str(current_user["_id"]):
-            raise HTTPException(status_code=403, detail="Not authorized to create task for this user")
-
-        # Simpan task ke database
-        new_task = await tasks_collection.insert_one(task.dict())
-
-        # Pastikan task berhasil disimpan
-        if not new_task.inserted_id:
-            raise HTTPException(status_code=500, detail="Failed to create task")
+    # Pastikan user_id yang dikirim sama dengan yang login
+    if task.user_id != str(current_user["_id"]):
+        raise HTTPException(status_code=403, detail="Not authorized to create task for this user")
+
+    # Simpan task ke database
+    new_task = await tasks_collection.insert_one(task.model_dump())
+
+    # Pastikan task berhasil disimpan
+    if not new_task.inserted_id:
+        raise HTTPException(status_code=500, detail="Failed to create task")
+
+    return {
+        "message": "Task created successfully",
+        "task_id": str(new_task.inserted_id)
+    }
+
+# Endpoint bulk didaftarkan sebelum route /tasks/{task_id}
+# agar "bulk" tidak terbaca sebagai task_id
+@app.post("/tasks/bulk", dependencies=[Depends(check_role(["admin", "editor"]))])
+async def create_tasks_bulk(tasks: List[Task] = Body(..., max_length=BULK_MAX_ITEMS), current_user: dict = Depends(get_current_user)):
+    if not tasks:
+        raise HTTPException(status_code=400, detail="No tasks provided")
+
+    # Pastikan semua task dibuat untuk user yang login
+    user_id = str(current_user["_id"])
+    if any(task.user_id != user_id for task in tasks):
+        raise HTTPException(status_code=403, detail="Not authorized to create task for this user")
+
+    # _id dibuat di sini agar bisa dikembalikan, BulkWriteResult tidak menyimpan id hasil insert
+    new_tasks = [{**task.model_dump(), "_id": ObjectId()} for task in tasks]
+
+    # semua insert dikirim dalam satu bulk_write, ordered=False agar tidak dieksekusi satu per satu
+    result = await tasks_collection.bulk_write([InsertOne(task) for task in new_tasks], ordered=False)
+
+    return {
+        "message": "Tasks created successfully",
+        "inserted_count": result.inserted_count,
+        "task_ids": [str(task["_id"]) for task in new_tasks]
+    }
+
+@app.patch("/tasks/bulk/complete")
+async def complete_tasks_bulk(task_ids: List[str] = Body(..., max_length=BULK_MAX_ITEMS), current_user: dict = Depends(get_current_user)):
+    if not task_ids:
+        raise HTTPException(status_code=400, detail="No task IDs provided")
+
+    object_ids = [parse_object_id(task_id, "Invalid task ID format") for task_id in task_ids]
+
+    # satu query untuk semua task, hanya task milik user yang login yang diupdate
+    result = await tasks_collection.update_many(
+        {"_id": {"$in": object_ids}, "user_id": str(current_user["_id"])},
+        {"$set": {"completed": True}}
+    )
 
-        return {
-            "message": "Task created successfully",
-            "task_id": str(new_task.inserted_id)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "message": "Tasks marked as completed",
+        "matched_count": result.matched_count,
+        "modified_count": result.modified_count
+    }
 
 @app.get("/tasks/{task_id}")
-async def get_task(task_id: str, current_user: dict = Depends(get_current_user)):
-    try:
-        object_id = ObjectId(task_id)
-    except:
-        raise HTTPException(status_code=400, detail="Invalid task ID format")
-
+async def get_task(task_id: ObjectId = Depends(task_object_id), current_user: dict = Depends(get_current_user)):
     #mencari semua data tasks berdasarkan user_id dalam format ObjectId
-    task = await tasks_collection.find_one({"_id": object_id, "user_id": str(current_user["_id"])})
+    task = await tasks_collection.find_one({"_id": task_id, "user_id": str(current_user["_id"])})
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found or not authorized")
 
-    # Konversi ObjectId ke string agar JSON bisa mengirimnya
-    task["_id"] = str(task["_id"])
-    task["user_id"] = str(task["user_id"])
-
-    return task
+    return MongoJSONResponse(content=task)
 
 @app.put("/tasks/{task_id}", dependencies=[Depends(check_role(["admin", "editor"]))])
-async def update_task(task_id: str, updated_task: dict, current_user: dict = Depends(get_current_user)):
-    try:
-        task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
-
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
+async def update_task(updated_task: dict, task_id: ObjectId = Depends(task_object_id), current_user: dict = Depends(get_current_user)):
+    # otorisasi ikut di filter query: hanya task milik user yang login yang diupdate
+    result = await tasks_collection.update_one(
+        {"_id": task_id, "user_id": str(current_user["_id"])},
+        {"$set": updated_task}
+    )
 
-        if task["user_id"] != current_user["_id"]:
-            raise HTTPException(status_code=403, detail="Not authorized to update this task")
+    if result.matched_count == 0:
+        await raise_not_found_or_forbidden(tasks_collection, task_id, "Task not found", "Not authorized to update this task")
 
-        await tasks_collection.update_one({"_id": ObjectId(task_id)}, {"$set": updated_task})
-        return {"message": "Task updated"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Task updated"}
 
 @app.patch("/tasks/{task_id}/complete")
-async def complete_task(task_id: str, current_user: dict = Depends(get_current_user)):
-    try:
-        task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
-
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
+async def complete_task(task_id: ObjectId = Depends(task_object_id), current_user: dict = Depends(get_current_user)):
+    result = await tasks_collection.update_one(
+        {"_id": task_id, "user_id": str(current_user["_id"])},
+        {"$set": {"completed": True}}
+    )
 
-        if task["user_id"] != current_user["_id"]:
-            raise HTTPException(status_code=403, detail="Not authorized to complete this task")
+    if result.matched_count == 0:
+        await raise_not_found_or_forbidden(tasks_collection, task_id, "Task not found", "Not authorized to complete this task")
 
-        await tasks_collection.update_one({"_id": ObjectId(task_id)}, {"$set": {"status": "completed"}})
-        return {"message": "Task marked as completed"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Task marked as completed"}
 
 @app.delete("/tasks/{task_id}", dependencies=[Depends(check_role(["admin"]))])
-async def delete_task(task_id: str, current_user: dict = Depends(get_current_user)):
-    try:
-        task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
+async def delete_task(task_id: ObjectId = Depends(task_object_id), current_user: dict = Depends(get_current_user)):
+    result = await tasks_collection.delete_one({"_id": task_id, "user_id": str(current_user["_id"])})
 
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        if task["user_id"] != current_user["_id"]:
-            raise HTTPException(status_code=403, detail="Not authorized to delete this task")
+    if result.deleted_count == 0:
+        await raise_not_found_or_forbidden(tasks_collection, task_id, "Task not found", "Not authorized to delete this task")
 
-        await tasks_collection.delete_one({"_id": ObjectId(task_id)})
-        return {"message": "Task deleted"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Task deleted"}
 
+# mode development (reload=True), untuk production jalankan run_prod.py
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,18 @@
+import os
+import uvicorn
+
+# Menjalankan aplikasi untuk production:
+# - tanpa reload (tidak ada file watcher)
+# - satu worker per CPU
+# - event loop uvloop dan parser HTTP httptools (lebih cepat dari default asyncio/h11)
+# - access log uvicorn dimatikan, logging request sudah ditangani LoggingASGIMiddleware di main.py
+if __name__ == "__main__":
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+    )